@@ -5,3 +5,34 @@ API_KEY = "yoojin-secret-2026-xyz789"  # 원하는 값으로 변경 가능
 
 # Cloudflare 터널 설정
 TUNNEL_PORT = 8765  # MCP 서버 포트
+
+# Host 라우팅 (Cloudflare 터널 호스트 → 커넥터)
+FILESYSTEM_HOST = "pc.jmshinhwa.org"
+COMMANDER_HOST = "pc-cmd.jmshinhwa.org"
+
+# 커넥터별 워커 수 (동시에 실행되는 도구 개수)
+FILESYSTEM_WORKERS = 8
+COMMANDER_WORKERS = 4
+
+# 스케줄러: 무거운 도구(bulk)는 가벼운 도구(interactive)보다 뒤로 밀림
+BULK_TOOLS = [
+    "read_multiple_files", "copy_file", "move_file", "delete_path", "search_files", "search_content", "disk_usage",
+    "tree_fingerprint",
+    "execute_command", "run_python", "git_command", "git_push",
+]
+
+# 도구별 최대 동시 실행 수 (없으면 워커 수만큼)
+TOOL_CONCURRENCY = {
+    "copy_file": 2,
+    "move_file": 2,
+    "delete_path": 2,
+    "search_files": 2,
+    "search_content": 2,
+    "disk_usage": 2,
+    "tree_fingerprint": 1,  # 전역 lock 안에서 트리 전체를 읽음
+    "run_python": 2,
+    "git_push": 1,
+}
+
+# 대기열 크기 (가득 차면 바로 거절)
+QUEUE_LIMITS = {"interactive": 64, "bulk": 16}
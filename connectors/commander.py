@@ -3,12 +3,19 @@ Commander Connector - 명령어/프로세스 관련 도구들
 호스트: pc-cmd.jmshinhwa.org
 """
 import os
+import signal
 import subprocess
 import platform
 import threading
 import time
+from collections import deque
 from datetime import datetime
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 # 도구 이름 목록 (필터링용)
 TOOLS = [
     "execute_command",
@@ -20,15 +27,29 @@ TOOLS = [
     "run_python",
     "git_command",
     "git_push",
+    "git_status",
+    "git_changed_files",
+    "git_log",
+    "git_diff_stat",
     "list_processes",
     "kill_process",
     "get_system_info",
 ]
 
 # 프로세스 관리
+SESSION_TTL = 600  # 끝난 세션을 남겨두는 시간 (초)
+MAX_SESSIONS = 20  # 동시에 실행 가능한 세션 수
+MAX_BUFFER_LINES = 10000  # 읽지 않은 출력은 최근 것만 보관
 active_processes = {}
 process_lock = threading.Lock()
 
+# Git 상태 캐시 (index/HEAD mtime이 같으면 재사용)
+GIT_WORKTREE_TTL = 2.0  # 작업 트리 변경은 index에 안 잡히므로 짧게만 재사용
+GIT_MAX_FILES = 2000
+git_cache = {}
+git_dirs = {}
+git_lock = threading.Lock()
+
 
 class ProcessSession:
     def __init__(self, pid, process, command, shell):
@@ -37,20 +58,252 @@ class ProcessSession:
         self.command = command
         self.shell = shell
         self.start_time = datetime.now()
-        self.output_buffer = []
+        self.end_time = None
+        self.exit_code = None
+        self.output_buffer = deque(maxlen=MAX_BUFFER_LINES)
+        self.dropped_lines = 0
         self.is_running = True
+        self.ps_process = None
+        self.tree = []  # 셸이 살아 있을 때 본 자손 프로세스 (셸이 먼저 끝나면 고아가 됨)
+        if psutil:
+            try:
+                self.ps_process = psutil.Process(pid)
+            except psutil.Error:
+                pass
         
     def read_output(self):
         try:
-            while self.is_running:
-                line = self.process.stdout.readline()
-                if line:
+            for line in iter(self.process.stdout.readline, ""):
+                with process_lock:
+                    if len(self.output_buffer) == MAX_BUFFER_LINES:
+                        self.dropped_lines += 1  # deque가 가장 오래된 줄을 버림
                     self.output_buffer.append(line)
-                elif self.process.poll() is not None:
-                    self.is_running = False
-                    break
+            # 출력이 닫혀도 프로세스가 끝날 때까지 기다려서 종료 코드 회수
+            self.process.wait()
         except:
-            self.is_running = False
+            pass
+        self.finish()
+        # 파이프는 EOF를 본 이 스레드에서만 닫음 (읽는 중에 다른 스레드가 닫으면 멈춤)
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                if pipe:
+                    pipe.close()
+            except Exception:
+                pass
+
+    def finish(self):
+        """종료 코드 기록 (zombie 방지)"""
+        try:
+            self.exit_code = self.process.wait(timeout=5)
+        except Exception:
+            self.exit_code = self.process.poll()
+        if self.end_time is None:
+            self.end_time = datetime.now()
+        self.is_running = False
+
+    def _refresh_tree(self):
+        """현재 자손을 self.tree에 합쳐서 기억"""
+        if not (psutil and self.ps_process):
+            return []
+        try:
+            children = self.ps_process.children(recursive=True)
+        except psutil.Error:
+            children = []
+        known = {p.pid for p in self.tree}
+        self.tree = [p for p in self.tree if p.is_running()] + [p for p in children if p.pid not in known]
+        return children
+
+    def _group_alive(self):
+        """프로세스 그룹에 아직 이 세션의 프로세스가 남아 있는지 (비면 그룹 ID가 재사용될 수 있음)"""
+        if self.process.returncode is None:
+            return True  # 셸을 아직 회수하지 않았으면 그 PID(= 그룹 ID)는 다른 프로세스가 못 씀
+        for p in self.tree:
+            try:
+                if p.is_running() and os.getpgid(p.pid) == self.pid:
+                    return True
+            except (OSError, psutil.Error):
+                pass
+        return False
+
+    def kill_tree(self):
+        """자식 프로세스까지 모두 종료 (셸이 이미 끝났어도 남은 자손까지)"""
+        self._refresh_tree()
+        if platform.system() != "Windows" and self._group_alive():
+            try:
+                # start_new_session이라 그룹 ID = pid, 셸이 끝나도 그룹은 남아 있음
+                os.killpg(self.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        elif not psutil and self.process.poll() is None:
+            subprocess.run(f"taskkill /F /T /PID {self.pid}", shell=True, capture_output=True)
+
+        for p in self.tree:
+            try:
+                p.kill()  # psutil이 생성 시각으로 PID 재사용을 걸러냄
+            except psutil.Error:
+                pass
+        if self.tree:
+            psutil.wait_procs(self.tree, timeout=5)
+        # 셸 자신은 Popen으로 종료/회수해야 종료 코드가 남음
+        if self.process.poll() is None:
+            self.process.kill()
+        self.finish()
+
+    def usage(self):
+        """프로세스 트리 전체의 CPU 시간 / 메모리(RSS)"""
+        if not (psutil and self.ps_process and self.is_running):
+            return {}
+        procs = [self.ps_process] + self._refresh_tree()
+        cpu_seconds = 0.0
+        rss = 0
+        for p in procs:
+            try:
+                times = p.cpu_times()
+                cpu_seconds += times.user + times.system
+                rss += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return {"cpu_seconds": round(cpu_seconds, 2), "rss_mb": round(rss / 1024 / 1024, 1), "process_count": len(procs)}
+
+
+def _reap_sessions():
+    """끝난 지 SESSION_TTL이 지난 세션 정리"""
+    now = datetime.now()
+    with process_lock:
+        expired = [pid for pid, session in active_processes.items()
+                   if session.end_time and (now - session.end_time).total_seconds() > SESSION_TTL]
+        for pid in expired:
+            del active_processes[pid]
+    return len(expired)
+
+
+def _run_git(repo, args, timeout=60):
+    """shell 없이 git 실행 (fsmonitor / untracked cache는 저장소 설정을 그대로 따름)"""
+    result = subprocess.run(["git", *args], capture_output=True, text=True,
+                            encoding="utf-8", errors="replace", timeout=timeout, cwd=repo)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed ({result.returncode})")
+    return result.stdout
+
+
+def _git_dir(repo):
+    """(git dir, common dir) - linked worktree에서는 refs가 common dir에 있음"""
+    with git_lock:
+        if repo in git_dirs:
+            return git_dirs[repo]
+    git_dir, common_dir = _run_git(repo, ["rev-parse", "--absolute-git-dir", "--git-common-dir"]).splitlines()
+    dirs = (git_dir, os.path.normpath(os.path.join(repo, common_dir)))
+    with git_lock:
+        git_dirs[repo] = dirs
+    return dirs
+
+
+def _git_state_key(dirs):
+    """index / HEAD / 현재 브랜치 ref의 mtime"""
+    git_dir, common_dir = dirs
+    key = []
+    paths = [os.path.join(git_dir, "index"), os.path.join(git_dir, "HEAD"), os.path.join(common_dir, "packed-refs")]
+    try:
+        with open(paths[1], "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        if head.startswith("ref: "):
+            paths.append(os.path.join(common_dir, *head[5:].split("/")))
+    except OSError:
+        pass
+    for p in paths:
+        try:
+            key.append(os.stat(p).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def _cached_git(repo, args, parse, worktree, revisions=""):
+    """같은 저장소 상태면 이전 파싱 결과를 돌려줍니다. (결과, 캐시 사용 여부)
+    revisions: HEAD 말고 다른 ref를 쓰는 호출은 rev-parse 결과(SHA)를 넘겨서 키에 포함"""
+    git_dir = _git_dir(repo)
+    cache_key = (repo, tuple(args), revisions)
+    state = _git_state_key(git_dir)
+    with git_lock:
+        entry = git_cache.get(cache_key)
+    if entry and entry["state"] == state and (not worktree or time.time() - entry["time"] < GIT_WORKTREE_TTL):
+        return entry["result"], True
+
+    result = parse(_run_git(repo, args))
+    # git status는 index를 갱신할 수 있으므로 실행 후 상태로 저장
+    with git_lock:
+        git_cache[cache_key] = {"state": _git_state_key(git_dir), "time": time.time(), "result": result}
+    return result, False
+
+
+def _parse_git_status(output):
+    """git status --porcelain=v2 --branch -z 출력 파싱"""
+    status = {"branch": None, "oid": None, "upstream": None, "ahead": 0, "behind": 0, "files": []}
+    records = output.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        if record.startswith("# "):
+            name, _, value = record[2:].partition(" ")
+            if name == "branch.head":
+                status["branch"] = None if value == "(detached)" else value
+            elif name == "branch.oid":
+                status["oid"] = None if value == "(initial)" else value
+            elif name == "branch.upstream":
+                status["upstream"] = value
+            elif name == "branch.ab":
+                ahead, behind = value.split()
+                status["ahead"], status["behind"] = int(ahead), -int(behind)
+        elif record[0] == "1":
+            parts = record.split(" ", 8)
+            status["files"].append({"path": parts[8], "index": parts[1][0], "worktree": parts[1][1], "kind": "changed"})
+        elif record[0] == "2":
+            parts = record.split(" ", 9)
+            status["files"].append({"path": parts[9], "orig_path": records[i], "index": parts[1][0],
+                                    "worktree": parts[1][1], "kind": "renamed"})
+            i += 1
+        elif record[0] == "u":
+            parts = record.split(" ", 10)
+            status["files"].append({"path": parts[10], "index": parts[1][0], "worktree": parts[1][1], "kind": "unmerged"})
+        elif record[0] == "?":
+            status["files"].append({"path": record[2:], "index": "?", "worktree": "?", "kind": "untracked"})
+    return status
+
+
+def _parse_git_log(output):
+    commits = []
+    for record in output.split("\x1e"):
+        record = record.strip("\n")
+        if not record:
+            continue
+        sha, author, email, date, subject = record.split("\x1f", 4)
+        commits.append({"sha": sha, "author": author, "email": email, "date": date, "subject": subject})
+    return commits
+
+
+def _parse_git_numstat(output):
+    """git diff --numstat -z 출력 파싱"""
+    files = []
+    records = output.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        added, deleted, path = record.split("\t", 2)
+        entry = {"path": path, "binary": added == "-"}
+        if not path:
+            # 이름 변경: 다음 두 레코드가 원래 경로 / 새 경로
+            entry["orig_path"], entry["path"] = records[i], records[i + 1]
+            i += 2
+        entry["added"] = 0 if entry["binary"] else int(added)
+        entry["deleted"] = 0 if entry["binary"] else int(deleted)
+        files.append(entry)
+    return files
 
 
 def register_tools(mcp):
@@ -82,6 +335,12 @@ def register_tools(mcp):
         try:
             cwd = os.path.expanduser(cwd)
             
+            _reap_sessions()
+            with process_lock:
+                running = sum(1 for session in active_processes.values() if session.is_running)
+            if running >= MAX_SESSIONS:
+                return {"error": f"Too many running sessions ({running}/{MAX_SESSIONS}), terminate one first"}
+            
             if "powershell" in shell.lower():
                 full_cmd = ["powershell.exe", "-Command", command]
             elif "cmd" in shell.lower():
@@ -89,8 +348,10 @@ def register_tools(mcp):
             else:
                 full_cmd = [shell, "-c", command]
             
+            # POSIX에서는 새 프로세스 그룹으로 시작해서 트리 전체를 종료할 수 있게
             process = subprocess.Popen(full_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                                       stdin=subprocess.PIPE, text=True, cwd=cwd, bufsize=1)
+                                       stdin=subprocess.PIPE, text=True, cwd=cwd, bufsize=1,
+                                       start_new_session=platform.system() != "Windows")
             
             pid = process.pid
             session = ProcessSession(pid, process, command, shell)
@@ -109,15 +370,18 @@ def register_tools(mcp):
                 with process_lock:
                     if pid in active_processes:
                         if active_processes[pid].output_buffer:
-                            initial_output = active_processes[pid].output_buffer.copy()
+                            initial_output = list(active_processes[pid].output_buffer)
                             active_processes[pid].output_buffer.clear()
                         if not active_processes[pid].is_running:
                             break
+                # 셸이 먼저 끝나도 force_terminate가 찾을 수 있게 자손을 기억
+                session._refresh_tree()
                 time.sleep(0.1)
             
             output_text = "".join(initial_output)
             return {"success": True, "pid": pid, "command": command, "shell": shell, 
-                    "is_running": session.is_running, "initial_output": output_text[:50000]}
+                    "is_running": session.is_running, "exit_code": session.exit_code,
+                    "initial_output": output_text[:50000]}
         except Exception as e:
             return {"error": str(e)}
 
@@ -140,7 +404,7 @@ def register_tools(mcp):
                 time.sleep(0.1)
             
             with process_lock:
-                lines = session.output_buffer.copy()
+                lines = list(session.output_buffer)
                 session.output_buffer.clear()
             
             if offset < 0:
@@ -149,7 +413,8 @@ def register_tools(mcp):
                 lines = lines[offset:offset + length]
             
             output = "".join(lines)
-            return {"success": True, "pid": pid, "output": output[:50000], "lines_read": len(lines), "is_running": session.is_running}
+            return {"success": True, "pid": pid, "output": output[:50000], "lines_read": len(lines),
+                    "is_running": session.is_running, "exit_code": session.exit_code}
         except Exception as e:
             return {"error": str(e)}
 
@@ -178,11 +443,12 @@ def register_tools(mcp):
                 time.sleep(0.1)
             
             with process_lock:
-                lines = session.output_buffer.copy()
+                lines = list(session.output_buffer)
                 session.output_buffer.clear()
             
             output = "".join(lines)
-            return {"success": True, "pid": pid, "output": output[:50000], "is_running": session.is_running}
+            return {"success": True, "pid": pid, "output": output[:50000],
+                    "is_running": session.is_running, "exit_code": session.exit_code}
         except Exception as e:
             return {"error": str(e)}
 
@@ -195,13 +461,12 @@ def register_tools(mcp):
                     return {"error": f"Process {pid} not found"}
                 session = active_processes[pid]
             
-            session.process.terminate()
-            session.is_running = False
+            session.kill_tree()
             
             with process_lock:
-                del active_processes[pid]
+                active_processes.pop(pid, None)
             
-            return {"success": True, "pid": pid, "status": "terminated"}
+            return {"success": True, "pid": pid, "status": "terminated", "exit_code": session.exit_code}
         except Exception as e:
             return {"error": str(e)}
 
@@ -209,16 +474,20 @@ def register_tools(mcp):
     def list_sessions() -> dict:
         """현재 활성화된 프로세스 세션 목록을 조회합니다."""
         try:
+            reaped = _reap_sessions()
             sessions = []
             with process_lock:
-                for pid, session in active_processes.items():
-                    runtime = (datetime.now() - session.start_time).total_seconds()
-                    sessions.append({
-                        "pid": pid, "command": session.command[:100], "shell": session.shell,
-                        "is_running": session.is_running, "runtime_seconds": round(runtime, 1),
-                        "buffer_lines": len(session.output_buffer)
-                    })
-            return {"success": True, "sessions": sessions, "count": len(sessions)}
+                items = list(active_processes.items())
+            for pid, session in items:
+                runtime = ((session.end_time or datetime.now()) - session.start_time).total_seconds()
+                sessions.append({
+                    "pid": pid, "command": session.command[:100], "shell": session.shell,
+                    "is_running": session.is_running, "exit_code": session.exit_code,
+                    "runtime_seconds": round(runtime, 1),
+                    "buffer_lines": len(session.output_buffer), "dropped_lines": session.dropped_lines,
+                    **session.usage()
+                })
+            return {"success": True, "sessions": sessions, "count": len(sessions), "reaped": reaped}
         except Exception as e:
             return {"error": str(e)}
 
@@ -257,6 +526,75 @@ def register_tools(mcp):
         except Exception as e:
             return {"error": str(e)}
 
+    @mcp.tool()
+    def git_status(repo_path: str) -> dict:
+        """Git 상태를 파싱된 레코드로 조회합니다. (브랜치, ahead/behind, 변경 파일)"""
+        try:
+            repo = os.path.expanduser(repo_path)
+            status, cached = _cached_git(repo, ["status", "--porcelain=v2", "--branch", "-z"],
+                                         _parse_git_status, worktree=True)
+            files = status["files"]
+            return {"success": True, **status, "files": files[:GIT_MAX_FILES], "count": len(files),
+                    "truncated": len(files) > GIT_MAX_FILES, "clean": not files, "cached": cached}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def git_changed_files(repo_path: str, include_untracked: bool = True) -> dict:
+        """변경된 파일 경로를 staged / unstaged / untracked / conflicted로 나눠 조회합니다."""
+        try:
+            repo = os.path.expanduser(repo_path)
+            status, cached = _cached_git(repo, ["status", "--porcelain=v2", "--branch", "-z"],
+                                         _parse_git_status, worktree=True)
+            groups = {"staged": [], "unstaged": [], "untracked": [], "conflicted": []}
+            for f in status["files"]:
+                if f["kind"] == "unmerged":
+                    groups["conflicted"].append(f["path"])
+                elif f["kind"] == "untracked":
+                    if include_untracked:
+                        groups["untracked"].append(f["path"])
+                else:
+                    if f["index"] != ".":
+                        groups["staged"].append(f["path"])
+                    if f["worktree"] != ".":
+                        groups["unstaged"].append(f["path"])
+            return {"success": True, **{k: v[:GIT_MAX_FILES] for k, v in groups.items()}, "cached": cached}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def git_log(repo_path: str, max_count: int = 20, path: str = "") -> dict:
+        """커밋 기록을 파싱된 레코드로 조회합니다."""
+        try:
+            repo = os.path.expanduser(repo_path)
+            args = ["log", f"-n{max_count}", "--format=%H%x1f%an%x1f%ae%x1f%aI%x1f%s%x1e"]
+            if path:
+                args += ["--", path]
+            commits, cached = _cached_git(repo, args, _parse_git_log, worktree=False)
+            return {"success": True, "commits": commits, "count": len(commits), "cached": cached}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def git_diff_stat(repo_path: str, staged: bool = False, base: str = "") -> dict:
+        """파일별 추가/삭제 줄 수를 조회합니다. (staged=True면 index 기준, base로 비교 대상 지정)"""
+        try:
+            repo = os.path.expanduser(repo_path)
+            args = ["diff", "--numstat", "-z"]
+            revisions = ""
+            if staged:
+                args.append("--cached")
+            if base:
+                args.append(base)
+                # base 브랜치가 움직이면 캐시가 무효가 되도록 SHA로 풀어서 키에 포함
+                revisions = _run_git(repo, ["rev-parse", base]).strip()
+            files, cached = _cached_git(repo, args, _parse_git_numstat, worktree=not staged, revisions=revisions)
+            return {"success": True, "files": files[:GIT_MAX_FILES], "count": len(files),
+                    "added": sum(f["added"] for f in files), "deleted": sum(f["deleted"] for f in files),
+                    "truncated": len(files) > GIT_MAX_FILES, "cached": cached}
+        except Exception as e:
+            return {"error": str(e)}
+
     @mcp.tool()
     def list_processes(filter_name: str = "") -> dict:
         """시스템 프로세스 목록을 조회합니다."""
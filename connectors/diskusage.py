@@ -0,0 +1,115 @@
+"""
+Disk Usage - 폴더 크기 집계 (폴더 mtime 캐시)
+폴더마다 직속 파일 합계와 하위 폴더 목록을 캐시하고,
+폴더 mtime이 그대로면 다시 scandir 하지 않습니다.
+(파일 내용만 바뀐 경우는 폴더 mtime이 안 바뀌므로 refresh=True로 재계산)
+"""
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from connectors.fileops import is_link_or_junction
+
+DU_WORKERS = 8
+TOP_FILES = 50  # 폴더별로 기억하는 큰 파일 개수
+MAX_CACHE_DIRS = 500000
+
+dir_cache = {}
+cache_lock = threading.Lock()
+worker_pool = ThreadPoolExecutor(max_workers=DU_WORKERS, thread_name_prefix="diskusage")
+
+
+def _scan_dir(path, refresh):
+    """폴더 하나의 직속 항목 집계. (항목, 캐시 사용 여부)"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {"mtime": None, "size": 0, "files": 0, "subdirs": [], "top_files": [], "denied": True}, False
+
+    with cache_lock:
+        entry = dir_cache.get(path)
+    if entry and not refresh and entry["mtime"] == mtime:
+        return entry, True
+
+    size = 0
+    files = []
+    subdirs = []
+    denied = False
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        # Windows 정션은 is_dir이 True → 따라가면 중복 집계/순환
+                        if not is_link_or_junction(e.path):
+                            subdirs.append(e.name)
+                    else:
+                        file_size = e.stat(follow_symlinks=False).st_size
+                        size += file_size
+                        files.append((file_size, e.name))
+                except OSError:
+                    continue
+    except OSError:
+        denied = True
+
+    entry = {
+        "mtime": mtime, "size": size, "files": len(files), "subdirs": subdirs,
+        "top_files": heapq.nlargest(TOP_FILES, files), "denied": denied,
+    }
+    with cache_lock:
+        if len(dir_cache) >= MAX_CACHE_DIRS:
+            dir_cache.clear()
+        dir_cache[path] = entry
+    return entry, False
+
+
+def disk_usage(root, top=20, refresh=False):
+    """root 아래 전체 크기 / 파일 수와 가장 큰 하위 항목 top개"""
+    start = time.time()
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"Not a directory: '{root}'")
+
+    # 1) 깊이별로 폴더를 병렬 스캔
+    nodes = {}
+    depth_order = []
+    scanned = cached = 0
+    frontier = [root]
+    while frontier:
+        results = list(worker_pool.map(lambda p: (p, _scan_dir(p, refresh)), frontier))
+        frontier = []
+        for path, (entry, hit) in results:
+            nodes[path] = entry
+            depth_order.append(path)
+            if hit:
+                cached += 1
+            else:
+                scanned += 1
+            frontier.extend(os.path.join(path, name) for name in entry["subdirs"])
+
+    # 2) 안쪽부터 합계 계산
+    totals = {}
+    for path in reversed(depth_order):
+        entry = nodes[path]
+        size, files, dirs = entry["size"], entry["files"], len(entry["subdirs"])
+        for name in entry["subdirs"]:
+            sub = totals[os.path.join(path, name)]
+            size += sub["size"]
+            files += sub["files"]
+            dirs += sub["dirs"]
+        totals[path] = {"size": size, "files": files, "dirs": dirs}
+
+    root_entry = nodes[root]
+    children = [{"name": name, "is_dir": False, "size": s, "files": 1} for s, name in root_entry["top_files"]]
+    for name in root_entry["subdirs"]:
+        t = totals[os.path.join(root, name)]
+        children.append({"name": name, "is_dir": True, "size": t["size"], "files": t["files"]})
+    children = heapq.nlargest(top, children, key=lambda c: c["size"])
+
+    return {
+        "path": root, **totals[root], "children": children,
+        "scanned_dirs": scanned, "cached_dirs": cached,
+        "denied_dirs": sum(1 for e in nodes.values() if e["denied"]),
+        "elapsed_seconds": round(time.time() - start, 3),
+    }
@@ -0,0 +1,476 @@
+"""
+File Operations - 대용량 복사/이동/삭제 엔진
+- 작은 파일 여러 개: 스레드 풀로 병렬 처리
+- 큰 파일: reflink → copy_file_range → sendfile → 일반 복사 순서로 시도
+- 오래 걸리는 작업은 백그라운드 Job으로 실행 (진행률 / 취소)
+"""
+import errno
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+FILEOPS_WORKERS = 8
+LARGE_FILE_SIZE = 8 * 1024 * 1024  # 이보다 크면 커널 복사 경로 사용
+CHUNK_SIZE = 64 * 1024 * 1024
+DELETE_BATCH = 256
+MAX_IN_FLIGHT = FILEOPS_WORKERS * 4
+JOB_TTL = 3600  # 끝난 Job 보관 시간 (초)
+MAX_ERRORS = 50
+
+FICLONE = 0x40049409  # Linux reflink ioctl
+IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003  # Windows 디렉토리 정션 (stat 모듈에는 Windows에서만 있음)
+
+# Job 관리
+jobs = {}
+jobs_lock = threading.Lock()
+worker_pool = ThreadPoolExecutor(max_workers=FILEOPS_WORKERS, thread_name_prefix="fileops")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def is_link_or_junction(path):
+    """심볼릭 링크나 Windows 디렉토리 정션 (삭제/집계 시 따라가면 안 되는 항목)"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(st.st_mode):
+        return True
+    return getattr(st, "st_reparse_tag", 0) == IO_REPARSE_TAG_MOUNT_POINT
+
+
+class FileJob:
+    def __init__(self, kind, source, destination=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.source = source
+        self.destination = destination
+        self.status = "scanning"
+        self.error = None
+        self.errors = []
+        self.total_files = 0
+        self.total_bytes = 0
+        self.done_files = 0
+        self.done_bytes = 0
+        self.start_time = time.time()
+        self.end_time = None
+        self.cancel_event = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+
+    def check_cancel(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def advance(self, files=0, nbytes=0):
+        with self.lock:
+            self.done_files += files
+            self.done_bytes += nbytes
+
+    def add_error(self, path, e):
+        with self.lock:
+            if len(self.errors) < MAX_ERRORS:
+                self.errors.append({"path": path, "error": str(e)})
+
+    def to_dict(self):
+        with self.lock:
+            if self.total_bytes:
+                progress = self.done_bytes / self.total_bytes
+            elif self.total_files:
+                progress = self.done_files / self.total_files
+            else:
+                progress = 1.0 if self.finished.is_set() else 0.0
+            return {
+                "job_id": self.id, "kind": self.kind, "status": self.status,
+                "source": self.source, "destination": self.destination,
+                "total_files": self.total_files, "done_files": self.done_files,
+                "total_bytes": self.total_bytes, "done_bytes": self.done_bytes,
+                "progress": round(progress * 100, 1),
+                "elapsed_seconds": round((self.end_time or time.time()) - self.start_time, 1),
+                "error": self.error, "errors": list(self.errors),
+            }
+
+
+# ==================== 복사 ====================
+
+def _reflink(fsrc, fdst):
+    """Btrfs/XFS 등에서 블록 공유 복사 (지원 안 하면 False)"""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _kernel_copy(fsrc, fdst, size, job):
+    """copy_file_range / sendfile로 유저 공간 버퍼 없이 복사. 처리 못 하면 False"""
+    for name in ("copy_file_range", "sendfile"):
+        fn = getattr(os, name, None)
+        if fn is None or (name == "sendfile" and not sys.platform.startswith("linux")):
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                job.check_cancel()
+                if name == "copy_file_range":
+                    n = fn(fsrc.fileno(), fdst.fileno(), min(CHUNK_SIZE, size - copied))
+                else:
+                    n = fn(fdst.fileno(), fsrc.fileno(), copied, min(CHUNK_SIZE, size - copied))
+                if n == 0:
+                    break
+                copied += n
+                job.advance(nbytes=n)
+            return True
+        except OSError as e:
+            if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP):
+                raise
+    return False
+
+
+def copy_one(src, dst, job):
+    """파일 하나 복사 (메타데이터 포함)"""
+    job.check_cancel()
+    size = os.stat(src).st_size
+    if size < LARGE_FILE_SIZE:
+        shutil.copy2(src, dst)
+        job.advance(files=1, nbytes=size)
+        return
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if _reflink(fsrc, fdst):
+            job.advance(nbytes=size)
+        elif not _kernel_copy(fsrc, fdst, size, job):
+            while True:
+                job.check_cancel()
+                buf = fsrc.read(1024 * 1024)
+                if not buf:
+                    break
+                fdst.write(buf)
+                job.advance(nbytes=len(buf))
+    shutil.copystat(src, dst)
+    job.advance(files=1)
+
+
+def _run_parallel(job, items, fn):
+    """items를 워커 풀에서 처리. 동시에 MAX_IN_FLIGHT개까지만 제출"""
+    pending = set()
+
+    def run(item):
+        if job.cancel_event.is_set():
+            return
+        try:
+            fn(item)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            job.add_error(item[0] if isinstance(item, tuple) else str(item), e)
+
+    for item in items:
+        job.check_cancel()
+        if len(pending) >= MAX_IN_FLIGHT:
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        pending.add(worker_pool.submit(run, item))
+    wait(pending)
+    job.check_cancel()
+
+
+def _copy_tree(job, src, dst):
+    # 1) 스캔: 디렉토리 생성 + 파일 목록 수집
+    #    copytree(symlinks=False)와 같이 링크된 파일/폴더는 내용을 복사 (자기 조상을 가리키는 링크는 건너뜀)
+    files = []
+    dirs = []
+    for root, dirnames, filenames in os.walk(src, followlinks=True, onerror=lambda e: job.add_error(e.filename, e)):
+        job.check_cancel()
+        target_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target_root, exist_ok=True)
+        dirs.append((root, target_root))
+        real_root = os.path.realpath(root)
+        for name in list(dirnames):
+            path = os.path.join(root, name)
+            if is_link_or_junction(path):
+                real_child = os.path.realpath(path)
+                if real_child == real_root or real_root.startswith(real_child.rstrip(os.sep) + os.sep):
+                    dirnames.remove(name)
+                    job.add_error(path, "link points to its own ancestor, skipped")
+        for name in filenames:
+            path = os.path.join(root, name)
+            try:
+                size = os.stat(path).st_size
+            except OSError as e:
+                job.add_error(path, e)
+                continue
+            files.append((path, os.path.join(target_root, name)))
+            with job.lock:
+                job.total_files += 1
+                job.total_bytes += size
+
+    # 2) 파일 복사 (병렬)
+    job.status = "running"
+    _run_parallel(job, files, lambda item: copy_one(item[0], item[1], job))
+
+    # 3) 폴더 메타데이터는 파일 복사 후에 (안쪽부터)
+    for source_dir, target_dir in reversed(dirs):
+        try:
+            shutil.copystat(source_dir, target_dir)
+        except OSError as e:
+            job.add_error(source_dir, e)
+
+
+def _copy(job, src, dst):
+    if os.path.isdir(src):
+        _copy_tree(job, src, dst)
+    else:
+        job.total_files = 1
+        job.total_bytes = os.stat(src).st_size
+        job.status = "running"
+        copy_one(src, dst, job)
+
+
+def _discard(job, path):
+    """중단된 복사가 만든 대상을 지움 (원본은 건드리지 않음)"""
+    if not os.path.lexists(path):
+        return
+    cleanup = FileJob("delete", path)
+    _delete(cleanup, path)
+    for e in cleanup.errors:
+        job.add_error(e["path"], e["error"])
+
+
+# ==================== 삭제 ====================
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except PermissionError:
+        # Windows 읽기 전용 파일
+        os.chmod(path, stat.S_IWRITE)
+        os.remove(path)
+
+
+def _remove_link(path):
+    """링크/정션 자체만 제거 (Windows의 폴더 링크와 정션은 rmdir로 지움)"""
+    if os.name == "nt" and os.path.isdir(path):
+        os.rmdir(path)
+    else:
+        os.remove(path)
+
+
+def _delete(job, path):
+    if is_link_or_junction(path):
+        job.total_files = 1
+        job.status = "running"
+        _remove_link(path)
+        job.advance(files=1)
+        return
+    if not os.path.isdir(path):
+        job.total_files = 1
+        job.status = "running"
+        _remove_file(path)
+        job.advance(files=1)
+        return
+
+    files = []
+    links = []
+    dirs = []
+    # shutil.rmtree와 같이 심볼릭 링크/정션 폴더 안으로는 들어가지 않고 링크만 지움
+    for root, dirnames, filenames in os.walk(path, onerror=lambda e: job.add_error(e.filename, e)):
+        job.check_cancel()
+        dirs.append(root)
+        files.extend(os.path.join(root, name) for name in filenames)
+        for name in list(dirnames):
+            if is_link_or_junction(os.path.join(root, name)):
+                dirnames.remove(name)
+                links.append(os.path.join(root, name))
+    job.total_files = len(files) + len(links)
+    job.status = "running"
+
+    for link in links:
+        job.check_cancel()
+        try:
+            _remove_link(link)
+            job.advance(files=1)
+        except OSError as e:
+            job.add_error(link, e)
+
+    def remove_batch(batch):
+        for p in batch:
+            if job.cancel_event.is_set():
+                return
+            try:
+                _remove_file(p)
+                job.advance(files=1)
+            except OSError as e:
+                job.add_error(p, e)
+
+    batches = [files[i:i + DELETE_BATCH] for i in range(0, len(files), DELETE_BATCH)]
+    _run_parallel(job, batches, remove_batch)
+
+    # 안쪽 폴더부터
+    for d in reversed(dirs):
+        job.check_cancel()
+        try:
+            os.rmdir(d)
+        except OSError as e:
+            job.add_error(d, e)
+
+
+# ==================== Job 실행 ====================
+
+def _prune_jobs():
+    now = time.time()
+    with jobs_lock:
+        for job_id in [k for k, j in jobs.items() if j.end_time and now - j.end_time > JOB_TTL]:
+            del jobs[job_id]
+
+
+def _start(job, target, on_abort=None):
+    _prune_jobs()
+    with jobs_lock:
+        jobs[job.id] = job
+
+    def run():
+        try:
+            target()
+            if job.errors:
+                job.status = "failed"
+                job.error = f"{len(job.errors)} item(s) failed"
+            else:
+                job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        try:
+            # 취소/실패 시 정리 (삭제 중이던 폴더 이름 되돌리기 등)
+            if on_abort and job.status != "done":
+                on_abort()
+        except Exception as e:
+            job.add_error(job.source, e)
+        finally:
+            job.end_time = time.time()
+            job.finished.set()
+
+    threading.Thread(target=run, daemon=True, name=f"fileops-job-{job.id}").start()
+    return job
+
+
+def start_copy(src, dst):
+    """복사 Job 시작 (대상이 이미 있으면 FileExistsError)"""
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"No such file or directory: '{src}'")
+    if os.path.isdir(src) and os.path.exists(dst):
+        raise FileExistsError(f"Destination already exists: '{dst}'")
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    job = FileJob("copy", src, dst)
+    created = not os.path.lexists(dst)
+
+    def discard():
+        # 취소/실패하면 이 Job이 새로 만든 대상만 지움 (덮어쓴 기존 파일은 남김)
+        if created:
+            _discard(job, dst)
+
+    return _start(job, lambda: _copy(job, src, dst), on_abort=discard)
+
+
+def _same_volume(src, dst):
+    """src와 dst(없으면 부모 폴더)가 같은 볼륨인지. 알 수 없으면 True (shutil.move에 맡김)"""
+    parent = dst if os.path.isdir(dst) else os.path.dirname(os.path.abspath(dst))
+    try:
+        return os.lstat(src).st_dev == os.stat(parent).st_dev
+    except OSError:
+        return True
+
+
+def start_move(src, dst):
+    """이동 Job 시작. 같은 볼륨이면 shutil.move 그대로, 다른 볼륨이면 복사 후 원본 삭제"""
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"No such file or directory: '{src}'")
+    job = FileJob("move", src, dst)
+
+    if os.path.islink(src) or _same_volume(src, dst):
+        # 덮어쓰기, 대소문자만 바꾸는 이름 변경 등은 shutil.move 동작을 그대로 따름
+        def rename():
+            job.total_files = 1
+            job.status = "running"
+            job.destination = shutil.move(src, dst)
+            job.advance(files=1)
+
+        return _start(job, rename)
+
+    if os.path.isdir(dst):
+        # shutil.move와 같이 폴더 안으로 이동
+        dst = os.path.join(dst, os.path.basename(src.rstrip(os.sep)))
+        if os.path.exists(dst):
+            raise FileExistsError(f"Destination path '{dst}' already exists")
+    elif os.path.isdir(src) and os.path.exists(dst):
+        raise FileExistsError(f"Destination already exists: '{dst}'")
+    job.destination = dst
+    created = not os.path.lexists(dst)
+    copied = []
+
+    def target():
+        _copy(job, src, dst)
+        job.check_cancel()
+        if job.errors:
+            return  # 복사가 온전하지 않으면 원본은 남겨둠
+        copied.append(True)
+        cleanup = FileJob("delete", src)
+        cleanup.cancel_event = job.cancel_event
+        _delete(cleanup, src)
+        for e in cleanup.errors:
+            job.add_error(e["path"], e["error"])
+
+    def discard():
+        # 원본 삭제를 시작한 뒤에는 대상이 유일한 온전한 사본이므로 남김
+        if created and not copied:
+            _discard(job, dst)
+
+    return _start(job, target, on_abort=discard)
+
+
+def start_delete(path):
+    """삭제 Job 시작. 폴더는 먼저 옆 이름으로 바꿔서 경로를 바로 비웁니다."""
+    if not os.path.lexists(path):
+        raise FileNotFoundError(f"No such file or directory: '{path}'")
+    job = FileJob("delete", path)
+    target_path = path
+    if os.path.isdir(path) and not is_link_or_junction(path):
+        parent, name = os.path.split(path.rstrip(os.sep))
+        tombstone = os.path.join(parent, f".{name}.deleting-{job.id}")
+        try:
+            os.rename(path, tombstone)
+            target_path = tombstone
+        except OSError:
+            pass  # 사용 중인 파일이 있으면 제자리에서 삭제
+
+    def restore():
+        # 취소/실패하면 남은 내용을 원래 이름으로 되돌림
+        if target_path != path and os.path.exists(target_path) and not os.path.exists(path):
+            os.rename(target_path, path)
+        elif target_path != path and os.path.exists(target_path):
+            job.add_error(target_path, f"remaining files left in '{target_path}'")
+
+    return _start(job, lambda: _delete(job, target_path), on_abort=restore)
+
+
+def get_job(job_id):
+    with jobs_lock:
+        return jobs.get(job_id)
+
+
+def list_jobs():
+    _prune_jobs()
+    with jobs_lock:
+        return list(jobs.values())
@@ -3,10 +3,11 @@ Filesystem Connector - 파일시스템 관련 도구들
 호스트: pc.jmshinhwa.org
 """
 import os
-import shutil
 import fnmatch
 from datetime import datetime
 
+from connectors import fileops, diskusage, fingerprint, patching
+
 # 도구 이름 목록 (필터링용)
 TOOLS = [
     "list_directory",
@@ -14,13 +15,19 @@ TOOLS = [
     "read_multiple_files",
     "write_file",
     "edit_block",
+    "apply_patch",
     "create_directory",
     "move_file",
     "copy_file",
     "delete_path",
+    "get_file_job",
+    "cancel_file_job",
+    "list_file_jobs",
     "search_files",
     "search_content",
     "get_file_info",
+    "disk_usage",
+    "tree_fingerprint",
 ]
 
 FILE_READ_LINE_LIMIT = 1000
@@ -29,6 +36,15 @@ def expand_path(path: str) -> str:
     return os.path.expanduser(path.replace("/", os.sep).replace("\\", os.sep))
 
 
+def job_result(job, timeout_ms):
+    """timeout_ms 안에 끝나면 결과, 아니면 job_id와 진행률을 반환"""
+    job.finished.wait(timeout_ms / 1000)
+    info = job.to_dict()
+    if job.status == "failed":
+        return {"error": info.pop("error"), **info}
+    return {"success": True, **info}
+
+
 def register_tools(mcp):
     """MCP 서버에 Filesystem 도구들 등록"""
     
@@ -144,6 +160,16 @@ def register_tools(mcp):
         except Exception as e:
             return {"error": str(e)}
 
+    @mcp.tool()
+    def apply_patch(patch: str, base_path: str = "~", dry_run: bool = False) -> dict:
+        """unified diff(여러 파일 가능)를 적용합니다. 모든 hunk가 맞을 때만 원자적으로 씁니다.
+        git의 rename from/to 헤더가 있을 때만 이름을 바꾸고, 그 외에는 기존 new 경로(없으면 old 경로) 한 곳만 수정합니다."""
+        try:
+            base = expand_path(base_path)
+            return patching.apply_patch(patch, base, dry_run)
+        except Exception as e:
+            return {"error": str(e)}
+
     @mcp.tool()
     def create_directory(path: str) -> dict:
         """폴더를 생성합니다."""
@@ -155,40 +181,69 @@ def register_tools(mcp):
             return {"error": str(e)}
 
     @mcp.tool()
-    def move_file(source: str, destination: str) -> dict:
-        """파일이나 폴더를 이동/이름변경합니다."""
+    def move_file(source: str, destination: str, timeout_ms: int = 30000) -> dict:
+        """파일이나 폴더를 이동/이름변경합니다. 오래 걸리면 백그라운드 작업(job_id)으로 계속합니다."""
         try:
             src = expand_path(source)
             dest = expand_path(destination)
-            shutil.move(src, dest)
-            return {"success": True, "source": src, "destination": dest}
+            return job_result(fileops.start_move(src, dest), timeout_ms)
         except Exception as e:
             return {"error": str(e)}
 
     @mcp.tool()
-    def copy_file(source: str, destination: str) -> dict:
-        """파일이나 폴더를 복사합니다."""
+    def copy_file(source: str, destination: str, timeout_ms: int = 30000) -> dict:
+        """파일이나 폴더를 복사합니다. 링크된 파일/폴더는 내용을 복사하고, 취소/실패하면 복사하던 대상은 지웁니다. 오래 걸리면 백그라운드 작업(job_id)으로 계속합니다."""
         try:
             src = expand_path(source)
             dest = expand_path(destination)
-            if os.path.isfile(src):
-                shutil.copy2(src, dest)
-            else:
-                shutil.copytree(src, dest)
-            return {"success": True, "source": src, "destination": dest}
+            return job_result(fileops.start_copy(src, dest), timeout_ms)
         except Exception as e:
             return {"error": str(e)}
 
     @mcp.tool()
-    def delete_path(path: str) -> dict:
-        """파일이나 폴더를 삭제합니다."""
+    def delete_path(path: str, timeout_ms: int = 30000) -> dict:
+        """파일이나 폴더를 삭제합니다. 링크/정션은 가리키는 대상을 건드리지 않고 링크만 지웁니다. 오래 걸리면 백그라운드 작업(job_id)으로 계속합니다."""
         try:
             path = expand_path(path)
-            if os.path.isfile(path):
-                os.remove(path)
-            elif os.path.isdir(path):
-                shutil.rmtree(path)
-            return {"success": True, "deleted": path}
+            if not os.path.lexists(path):
+                return {"success": True, "deleted": path}
+            result = job_result(fileops.start_delete(path), timeout_ms)
+            if result.get("status") == "done":
+                result["deleted"] = path
+            return result
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def get_file_job(job_id: str, timeout_ms: int = 0) -> dict:
+        """복사/이동/삭제 작업의 진행 상태를 조회합니다. timeout_ms 동안 완료를 기다릴 수 있습니다."""
+        try:
+            job = fileops.get_job(job_id)
+            if job is None:
+                return {"error": f"Job {job_id} not found"}
+            return job_result(job, timeout_ms)
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def cancel_file_job(job_id: str) -> dict:
+        """진행 중인 복사/이동/삭제 작업을 취소합니다."""
+        try:
+            job = fileops.get_job(job_id)
+            if job is None:
+                return {"error": f"Job {job_id} not found"}
+            job.cancel_event.set()
+            job.finished.wait(5)
+            return {"success": True, **job.to_dict()}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def list_file_jobs() -> dict:
+        """복사/이동/삭제 작업 목록을 조회합니다."""
+        try:
+            jobs = [job.to_dict() for job in fileops.list_jobs()]
+            return {"success": True, "jobs": jobs, "count": len(jobs)}
         except Exception as e:
             return {"error": str(e)}
 
@@ -283,3 +338,22 @@ def register_tools(mcp):
             return info
         except Exception as e:
             return {"error": str(e)}
+
+    @mcp.tool()
+    def disk_usage(path: str = "~", top: int = 20, refresh: bool = False) -> dict:
+        """폴더 전체 크기와 파일 수, 가장 큰 하위 항목을 조회합니다. (바뀐 폴더만 다시 스캔, refresh=True면 전부)"""
+        try:
+            path = expand_path(path)
+            return {"success": True, **diskusage.disk_usage(path, top, refresh)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @mcp.tool()
+    def tree_fingerprint(path: str, previous: str = "", content_hash: bool = False,
+                         exclude: list = None, max_changes: int = 500) -> dict:
+        """폴더 전체의 Merkle 해시를 계산합니다. previous에 이전 root_hash를 주면 바뀐 경로 목록도 반환합니다."""
+        try:
+            path = expand_path(path)
+            return {"success": True, **fingerprint.fingerprint(path, previous, content_hash, exclude, max_changes)}
+        except Exception as e:
+            return {"error": str(e)}
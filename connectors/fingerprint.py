@@ -0,0 +1,147 @@
+"""
+Tree Fingerprint - 폴더 전체 Merkle 해시
+파일은 (크기, mtime) 또는 내용 해시, 폴더는 하위 항목 해시를 묶어서 해시합니다.
+이전 결과와 해시가 같은 가지는 그대로 재사용하고, 달라진 가지만 따라가서 변경 경로를 찾습니다.
+"""
+import fnmatch
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from connectors.fileops import is_link_or_junction
+
+DEFAULT_EXCLUDE = [".git", "node_modules", "__pycache__"]
+MAX_SNAPSHOTS = 16  # 이전 지문 비교용으로 보관하는 트리 개수
+MAX_CACHE_ENTRIES = 500000
+HASH_CHUNK = 1024 * 1024
+
+# 노드: (해시, 하위 dict 또는 None)
+file_cache = {}  # (경로, 내용해시 여부) → (크기, mtime, 해시)
+dir_cache = {}  # (경로, 옵션) → 노드
+snapshots = OrderedDict()  # (루트, 옵션, 루트 해시) → 노드
+build_lock = threading.Lock()
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(str(part).encode("utf-8", "surrogateescape"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _content_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_node(path, st, content, stats):
+    if not content:
+        return (_digest("F", st.st_size, st.st_mtime_ns), None)
+
+    cached = file_cache.get((path, content))
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return (cached[2], None)
+
+    node_hash = _digest("F", st.st_size, _content_digest(path))
+    stats["rehashed_files"] += 1
+    file_cache[(path, content)] = (st.st_size, st.st_mtime_ns, node_hash)
+    return (node_hash, None)
+
+
+def _dir_node(path, options, stats):
+    content, exclude = options
+    children = {}
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                if any(fnmatch.fnmatch(e.name, pattern) for pattern in exclude):
+                    continue
+                try:
+                    if e.is_symlink() or (e.is_dir(follow_symlinks=False) and is_link_or_junction(e.path)):
+                        # 링크/정션은 대상 경로만 해시 (따라가면 순환 가능)
+                        children[e.name] = (_digest("L", os.readlink(e.path)), None)
+                    elif e.is_dir():
+                        children[e.name] = _dir_node(e.path, options, stats)
+                    else:
+                        children[e.name] = _file_node(e.path, e.stat(), content, stats)
+                        stats["files"] += 1
+                except OSError as err:
+                    children[e.name] = (_digest("E", err.errno), None)
+    except OSError as err:
+        return (_digest("E", err.errno), None)
+    stats["dirs"] += 1
+
+    node_hash = _digest("D", *(f"{name}:{children[name][0]}" for name in sorted(children)))
+    old = dir_cache.get((path, options))
+    if old and old[0] == node_hash:
+        # 바뀐 게 없으면 예전 노드를 그대로 써서 스냅샷끼리 공유
+        return old
+    node = (node_hash, children)
+    dir_cache[(path, options)] = node
+    return node
+
+
+def _diff(old, new, prefix, changes, limit):
+    """해시가 다른 가지만 내려가며 added / removed / modified 경로 수집"""
+    if old[0] == new[0] or sum(len(v) for v in changes.values()) >= limit:
+        return
+    if old[1] is None or new[1] is None:
+        changes["modified"].append(prefix or ".")
+        return
+    for name in sorted(set(old[1]) | set(new[1])):
+        path = f"{prefix}/{name}" if prefix else name
+        if name not in old[1]:
+            changes["added"].append(path)
+        elif name not in new[1]:
+            changes["removed"].append(path)
+        else:
+            _diff(old[1][name], new[1][name], path, changes, limit)
+
+
+def fingerprint(root, previous="", content=False, exclude=None, max_changes=500):
+    """root의 Merkle 루트 해시와, previous 해시 대비 변경 경로"""
+    start = time.time()
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"Not a directory: '{root}'")
+    options = (content, tuple(DEFAULT_EXCLUDE if exclude is None else exclude))
+    stats = {"files": 0, "dirs": 0, "rehashed_files": 0}
+
+    with build_lock:
+        if len(file_cache) + len(dir_cache) > MAX_CACHE_ENTRIES:
+            file_cache.clear()
+            dir_cache.clear()
+        node = _dir_node(root, options, stats)
+
+        snapshots[(root, options, node[0])] = node
+        snapshots.move_to_end((root, options, node[0]))
+        while len(snapshots) > MAX_SNAPSHOTS:
+            snapshots.popitem(last=False)
+        old = snapshots.get((root, options, previous)) if previous else None
+
+    result = {
+        "path": root, "root_hash": node[0], "content_hash": content, "exclude": list(options[1]),
+        **stats, "elapsed_seconds": round(time.time() - start, 3),
+    }
+    if previous:
+        result["previous"] = previous
+        result["changed"] = previous != node[0]
+        if old is None and result["changed"]:
+            # 보관 기간이 지난 지문이면 변경 여부만 알 수 있음
+            result["previous_known"] = False
+        else:
+            changes = {"added": [], "removed": [], "modified": []}
+            if old is not None:
+                _diff(old, node, "", changes, max_changes)
+            result["previous_known"] = True
+            result.update(changes)
+            result["truncated"] = sum(len(v) for v in changes.values()) >= max_changes
+    return result
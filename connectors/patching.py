@@ -0,0 +1,318 @@
+"""
+Patching - unified diff 적용
+여러 파일의 diff를 한 번에 받아서 파일마다 한 번만 훑으며 hunk를 적용합니다.
+모든 hunk가 맞아야 쓰고, 임시 파일 → os.replace로 원자적으로 교체합니다.
+"""
+import os
+import re
+import shutil
+import tempfile
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+DEV_NULL = "/dev/null"
+C_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+
+
+class PatchError(Exception):
+    pass
+
+
+class Hunk:
+    def __init__(self, old_start, old_len, new_start, new_len):
+        self.old_start = old_start
+        self.old_len = old_len
+        self.new_start = new_start
+        self.new_len = new_len
+        self.lines = []  # (" " / "-" / "+", 텍스트)
+        self.new_no_eol = False
+
+    @property
+    def old_lines(self):
+        return [text for tag, text in self.lines if tag != "+"]
+
+
+class FilePatch:
+    def __init__(self, old_path, new_path, rename=False):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.rename = rename  # git의 rename from/to 헤더가 있을 때만
+        self.hunks = []
+
+
+def _unquote(path):
+    """git의 C 스타일 인용 경로 풀기 ("a/\\355\\225\\234.txt" → a/한.txt)"""
+    if len(path) < 2 or path[0] != '"' or path[-1] != '"':
+        return path
+    body = path[1:-1]
+    out = bytearray()
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if ch != "\\" or i + 1 >= len(body):
+            out += ch.encode("utf-8", "surrogateescape")
+            i += 1
+        elif body[i + 1] in "01234567":
+            digits = re.match(r"[0-7]{1,3}", body[i + 1:]).group(0)
+            out.append(int(digits, 8) & 0xFF)
+            i += 1 + len(digits)
+        elif body[i + 1] in C_ESCAPES:
+            out.append(C_ESCAPES[body[i + 1]])
+            i += 2
+        else:
+            out += ch.encode("utf-8")  # 모르는 escape는 그대로
+            i += 1
+    return out.decode("utf-8", "surrogateescape")
+
+
+def _header_path(value):
+    return _unquote(value.split("\t")[0].strip())
+
+
+def _strip_prefixes(old, new):
+    """git diff의 a/ b/ 접두사 제거"""
+    if (old == DEV_NULL or old.startswith("a/")) and (new == DEV_NULL or new.startswith("b/")):
+        old = old if old == DEV_NULL else old[2:]
+        new = new if new == DEV_NULL else new[2:]
+    return old, new
+
+
+def parse_patch(text):
+    """unified diff 텍스트 → FilePatch 목록"""
+    lines = [line[:-1] if line.endswith("\r") else line for line in text.split("\n")]
+    patches = []
+    current = None
+    renames = {}  # 현재 diff --git 구간의 rename from/to
+    git_section = None  # 현재 diff --git 구간에서 만든 FilePatch
+
+    def end_section():
+        # hunk 없는 순수 rename은 ---/+++ 없이 헤더만 있음
+        if git_section is None and "from" in renames and "to" in renames:
+            patches.append(FilePatch(renames["from"], renames["to"], rename=True))
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("diff --git "):
+            end_section()
+            renames = {}
+            git_section = current = None
+            i += 1
+            continue
+        if line.startswith("rename from ") or line.startswith("rename to "):
+            key, _, path = line[len("rename "):].partition(" ")
+            renames[key] = _unquote(path)
+            i += 1
+            continue
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            old, new = _strip_prefixes(_header_path(line[4:]), _header_path(lines[i + 1][4:]))
+            current = FilePatch(old, new, rename="from" in renames and "to" in renames)
+            patches.append(current)
+            git_section = current
+            i += 2
+            continue
+
+        m = HUNK_RE.match(line)
+        if not m:
+            i += 1  # index, mode 등 나머지 헤더는 무시
+            continue
+        if current is None:
+            raise PatchError(f"Hunk without file header at line {i + 1}")
+
+        hunk = Hunk(int(m.group(1)), int(m.group(2) or 1), int(m.group(3)), int(m.group(4) or 1))
+        current.hunks.append(hunk)
+        i += 1
+        old_seen = new_seen = 0
+        while i < len(lines) and (old_seen < hunk.old_len or new_seen < hunk.new_len or lines[i].startswith("\\")):
+            line = lines[i]
+            i += 1
+            if line.startswith("\\"):
+                # "\ No newline at end of file": 바로 앞 줄에 해당
+                if hunk.lines and hunk.lines[-1][0] != "-":
+                    hunk.new_no_eol = True
+                continue
+            tag = line[:1] or " "  # 빈 줄은 공백이 지워진 context
+            if tag == " ":
+                old_seen += 1
+                new_seen += 1
+            elif tag == "-":
+                old_seen += 1
+            elif tag == "+":
+                new_seen += 1
+            else:
+                raise PatchError(f"Unexpected line in hunk at line {i}: {line[:50]!r}")
+            hunk.lines.append((tag, line[1:]))
+        if old_seen != hunk.old_len or new_seen != hunk.new_len:
+            raise PatchError(f"Truncated hunk '{m.group(0)}' in {current.new_path}")
+
+    end_section()
+    if not patches:
+        raise PatchError("No file headers (---/+++) found in patch")
+    return patches
+
+
+def _split_lines(data):
+    """줄바꿈을 유지한 채 '\\n' 기준으로만 분리"""
+    parts = data.split("\n")
+    lines = [part + "\n" for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def _body(line):
+    if line.endswith("\n"):
+        line = line[:-1]
+    if line.endswith("\r"):
+        line = line[:-1]
+    return line
+
+
+def _matches(lines, old, at):
+    if at < 0 or at + len(old) > len(lines):
+        return False
+    return all(_body(lines[at + k]) == old[k] for k in range(len(old)))
+
+
+def _find(lines, old, expected, lo):
+    """expected에서 가장 가까운 일치 위치 (lo 이전은 이미 지나감)"""
+    if not old:
+        return min(max(expected, lo), len(lines))
+    for delta in range(0, len(lines) + 1):
+        for at in (expected - delta, expected + delta) if delta else (expected,):
+            if at >= lo and _matches(lines, old, at):
+                return at
+        if expected - delta < lo and expected + delta > len(lines) - len(old):
+            break
+    return None
+
+
+def _apply_file(fp, base, dry_run):
+    """파일 하나에 hunk 적용 → (결과 dict, 커밋 동작)"""
+    old_path = None if fp.old_path == DEV_NULL else os.path.join(base, fp.old_path)
+    new_path = None if fp.new_path == DEV_NULL else os.path.join(base, fp.new_path)
+    if fp.rename:
+        source, target = old_path, new_path
+        if os.path.exists(target):
+            raise PatchError(f"{fp.new_path}: rename target already exists")
+    elif old_path is None or new_path is None:
+        source, target = old_path, new_path
+    elif os.path.exists(new_path):
+        # 일반 diff는 GNU patch처럼 기존 new 경로, 없으면 old 경로 한 곳에만 적용
+        source = target = new_path
+    else:
+        source = target = old_path
+    display = fp.new_path if target is not None and target == new_path else fp.old_path
+    result = {"path": display, "hunks": [], "added": 0, "removed": 0}
+
+    if source is None:
+        if os.path.exists(target):
+            raise PatchError(f"{display}: file already exists")
+        lines = []
+    else:
+        with open(source, "rb") as f:
+            lines = _split_lines(f.read().decode("utf-8", "surrogateescape"))
+    eol = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+    out = []
+    pos = 0
+    offset = 0
+    failed = 0
+    for index, hunk in enumerate(fp.hunks, 1):
+        old = hunk.old_lines
+        start = hunk.old_start if hunk.old_len == 0 else hunk.old_start - 1
+        at = _find(lines, old, start + offset, pos)
+        if at is None:
+            failed += 1
+            result["hunks"].append({"hunk": index, "old_start": hunk.old_start, "status": "failed",
+                                    "error": "context does not match"})
+            continue
+
+        out.extend(lines[pos:at])
+        k = at
+        plus = [n for n, (tag, _) in enumerate(hunk.lines) if tag == "+"]
+        for n, (tag, text) in enumerate(hunk.lines):
+            if tag == " ":
+                out.append(lines[k])  # 원본 줄 그대로 (줄바꿈/공백 보존)
+                k += 1
+            elif tag == "-":
+                k += 1
+                result["removed"] += 1
+            else:
+                no_eol = hunk.new_no_eol and n == plus[-1] and n == len(hunk.lines) - 1
+                out.append(text if no_eol else text + eol)
+                result["added"] += 1
+        pos = k
+        offset = at - start
+        result["hunks"].append({"hunk": index, "old_start": hunk.old_start, "status": "applied",
+                                "offset": offset})
+    out.extend(lines[pos:])
+
+    if failed:
+        result["status"] = "failed"
+        return result, None
+    if target is None:
+        if out:
+            raise PatchError(f"{display}: file is not empty after applying deletion")
+        result["status"] = "deleted"
+        return result, ("delete", source, None)
+
+    result["status"] = "created" if source is None else ("renamed" if fp.rename else "modified")
+    if dry_run:
+        return result, None
+
+    # 같은 폴더에 임시 파일로 쓰고, 커밋 단계에서 os.replace
+    target_dir = os.path.dirname(target) or "."
+    os.makedirs(target_dir, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=target_dir, prefix=".patch-", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        for line in out:
+            f.write(line.encode("utf-8", "surrogateescape"))
+    if source is not None:
+        shutil.copymode(source, temp)
+    # rename일 때만 원래 파일을 지움
+    return result, ("write", temp, target, source if fp.rename else None)
+
+
+def apply_patch(text, base, dry_run=False):
+    """여러 파일 diff 적용. 하나라도 실패하면 아무 파일도 바꾸지 않습니다."""
+    results = []
+    actions = []
+    try:
+        for fp in parse_patch(text):
+            try:
+                result, action = _apply_file(fp, base, dry_run)
+            except (OSError, PatchError) as e:
+                path = fp.old_path if fp.new_path == DEV_NULL else fp.new_path
+                result, action = {"path": path, "status": "failed", "error": str(e), "hunks": []}, None
+            results.append(result)
+            if action:
+                actions.append(action)
+
+        failed = [r for r in results if r["status"] == "failed"]
+        summary = {
+            "files": results,
+            "hunks_applied": sum(1 for r in results for h in r["hunks"] if h["status"] == "applied"),
+            "hunks_failed": sum(1 for r in results for h in r["hunks"] if h["status"] == "failed"),
+            "dry_run": dry_run,
+        }
+        if failed:
+            return {"error": f"{len(failed)} file(s) failed to apply, no files were changed", **summary}
+        if dry_run:
+            return {"success": True, **summary}
+
+        for action in actions:
+            if action[0] == "write":
+                _, temp, target, renamed_from = action
+                os.replace(temp, target)
+                if renamed_from is not None:
+                    os.remove(renamed_from)
+        for action in actions:
+            if action[0] == "delete":
+                os.remove(action[1])
+        actions = []
+        return {"success": True, **summary}
+    finally:
+        # 실패했거나 dry_run이면 임시 파일 정리
+        for action in actions:
+            if action[0] == "write" and os.path.exists(action[1]):
+                os.remove(action[1])
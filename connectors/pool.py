@@ -0,0 +1,62 @@
+"""
+Worker Pool - 커넥터별 전용 스레드 풀
+Filesystem / Commander 도구가 서로의 작업 때문에 밀리지 않도록
+커넥터마다 독립된 실행기를 붙여서 도구를 등록합니다.
+스케줄러가 있으면 실행 전에 슬롯을 받아야 합니다.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from connectors.scheduler import SchedulerBusy
+
+
+class WorkerPool:
+    """커넥터 하나가 쓰는 전용 스레드 풀"""
+
+    def __init__(self, name, max_workers, scheduler=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.scheduler = scheduler
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+
+    def wrap(self, fn):
+        """동기 도구 함수를 이 풀에서 실행하는 async 함수로 감쌉니다."""
+        @functools.wraps(fn)
+        async def runner(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            if self.scheduler is None:
+                return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+            try:
+                await self.scheduler.acquire(fn.__name__)
+            except SchedulerBusy as e:
+                return {"error": str(e)}
+            # 요청이 취소돼도 스레드가 실제로 끝날 때 슬롯을 반납
+            future = self.executor.submit(fn, *args, **kwargs)
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.scheduler.release, fn.__name__))
+            return await asyncio.wrap_future(future)
+        return runner
+
+    def bind(self, mcp):
+        """register_tools(mcp)에 그대로 넘길 수 있는 래퍼를 반환합니다."""
+        return PooledMCP(mcp, self)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PooledMCP:
+    """mcp.tool() 데코레이터를 가로채서 도구를 WorkerPool에서 실행하게 합니다."""
+
+    def __init__(self, mcp, pool):
+        self.mcp = mcp
+        self.pool = pool
+
+    def tool(self, *args, **kwargs):
+        def decorator(fn):
+            return self.mcp.tool(*args, **kwargs)(self.pool.wrap(fn))
+        return decorator
+
+    def __getattr__(self, name):
+        return getattr(self.mcp, name)
@@ -0,0 +1,144 @@
+"""
+Tool Scheduler - 도구 호출 입장 제어 / 우선순위 스케줄링
+FastMCP와 커넥터 함수 사이에서 동시 실행 수를 제한합니다.
+
+- interactive: get_file_info 같은 가벼운 호출 (먼저 실행)
+- bulk: search_content, copy_file 같은 무거운 호출 (워커 1개는 interactive용으로 남겨둠)
+- 대기열이 가득 차면 기다리지 않고 바로 거절
+"""
+import asyncio
+import time
+from collections import Counter, deque
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+# 도구 이름 목록 (필터링용)
+TOOLS = [
+    "get_scheduler_stats",
+]
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class ToolScheduler:
+    """워커 풀 하나에 붙는 스케줄러 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, name, slots, bulk_tools=(), tool_limits=None, queue_limits=None):
+        self.name = name
+        self.slots = slots
+        self.bulk_slots = max(1, slots - 1)
+        self.bulk_tools = set(bulk_tools)
+        self.tool_limits = dict(tool_limits or {})
+        self.queue_limits = {INTERACTIVE: 64, BULK: 16}
+        self.queue_limits.update(queue_limits or {})
+        self.queues = {p: deque() for p in PRIORITIES}
+        self.running = Counter()
+        self.running_by_tool = Counter()
+        self.tool_stats = {}
+
+    def priority(self, tool):
+        return BULK if tool in self.bulk_tools else INTERACTIVE
+
+    def _stats(self, tool):
+        if tool not in self.tool_stats:
+            self.tool_stats[tool] = {"calls": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0, "wait_last": 0.0}
+        return self.tool_stats[tool]
+
+    def _can_start(self, tool, priority):
+        if sum(self.running.values()) >= self.slots:
+            return False
+        if priority == BULK and self.running[BULK] >= self.bulk_slots:
+            return False
+        return self.running_by_tool[tool] < self.tool_limits.get(tool, self.slots)
+
+    def _dispatch(self):
+        """대기 중인 호출을 우선순위 순서로 실행 허가"""
+        for priority in PRIORITIES:
+            queue = self.queues[priority]
+            for waiter in list(queue):
+                tool, future = waiter
+                if future.done():
+                    queue.remove(waiter)
+                    continue
+                if not self._can_start(tool, priority):
+                    continue
+                queue.remove(waiter)
+                self.running[priority] += 1
+                self.running_by_tool[tool] += 1
+                future.set_result(None)
+
+    async def acquire(self, tool):
+        """실행 슬롯을 기다립니다. 대기열이 가득 차면 SchedulerBusy. 대기 시간(초) 반환."""
+        priority = self.priority(tool)
+        queue = self.queues[priority]
+        stats = self._stats(tool)
+
+        if len(queue) >= self.queue_limits[priority]:
+            stats["rejected"] += 1
+            raise SchedulerBusy(
+                f"Server busy: {self.name} {priority} queue is full ({len(queue)} waiting), try again later"
+            )
+
+        start = time.monotonic()
+        waiter = (tool, asyncio.get_running_loop().create_future())
+        queue.append(waiter)
+        self._dispatch()
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter[1].done() and not waiter[1].cancelled():
+                self.release(tool)
+            raise
+
+        wait = time.monotonic() - start
+        stats["calls"] += 1
+        stats["wait_total"] += wait
+        stats["wait_max"] = max(stats["wait_max"], wait)
+        stats["wait_last"] = wait
+        return wait
+
+    def release(self, tool):
+        self.running[self.priority(tool)] -= 1
+        self.running_by_tool[tool] -= 1
+        self._dispatch()
+
+    def snapshot(self):
+        """대기열 깊이 / 실행 수 / 대기 시간 통계"""
+        tools = {}
+        for tool, s in self.tool_stats.items():
+            tools[tool] = {
+                "priority": self.priority(tool),
+                "limit": self.tool_limits.get(tool, self.slots),
+                "running": self.running_by_tool[tool],
+                "waiting": sum(1 for p in PRIORITIES for t, _ in self.queues[p] if t == tool),
+                "calls": s["calls"], "rejected": s["rejected"],
+                "avg_wait_ms": round(s["wait_total"] / s["calls"] * 1000, 1) if s["calls"] else 0,
+                "max_wait_ms": round(s["wait_max"] * 1000, 1),
+                "last_wait_ms": round(s["wait_last"] * 1000, 1),
+            }
+        return {
+            "name": self.name, "slots": self.slots, "bulk_slots": self.bulk_slots,
+            "queues": {
+                p: {"depth": len(self.queues[p]), "limit": self.queue_limits[p], "running": self.running[p]}
+                for p in PRIORITIES
+            },
+            "tools": tools,
+        }
+
+
+def register_tools(mcp, schedulers):
+    """MCP 서버에 스케줄러 조회 도구 등록"""
+
+    @mcp.tool()
+    async def get_scheduler_stats() -> dict:
+        """커넥터별 대기열 깊이, 실행 중인 호출 수, 도구별 대기 시간을 조회합니다."""
+        try:
+            return {"success": True, "schedulers": [s.snapshot() for s in schedulers]}
+        except Exception as e:
+            return {"error": str(e)}
@@ -1,35 +1,90 @@
 """
-통합 MCP Server - 단순화 버전
-포트: 8765 / 모든 도구 노출
+통합 MCP Server - Host 라우팅 버전
+포트: 8765 / Host 헤더로 커넥터 구분
 
 Claude.ai 웹에서 등록:
-- pc.jmshinhwa.org/mcp?key=yoojin-secret-2026-xyz789
-- pc-cmd.jmshinhwa.org/mcp?key=yoojin-secret-2026-xyz789
+- pc.jmshinhwa.org/mcp?key=yoojin-secret-2026-xyz789 → Filesystem
+- pc-cmd.jmshinhwa.org/mcp?key=yoojin-secret-2026-xyz789 → Commander
+- 그 외 Host (127.0.0.1 등) → 모든 도구
+
+커넥터마다 전용 워커 풀을 써서 Commander의 긴 작업이
+Filesystem 읽기를 막지 않습니다.
 
 API Key: URL 쿼리 파라미터로 검증 (?key=xxx)
 """
 import os
 import sys
+import contextlib
 
 # 현재 디렉토리를 path에 추가 (connectors 임포트용)
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.routing import Host, Mount
 import uvicorn
 
 # 커넥터 임포트
-from connectors import filesystem, commander
+from connectors import filesystem, commander, scheduler
+from connectors.pool import WorkerPool
+from connectors.scheduler import ToolScheduler
+from config import FILESYSTEM_HOST, COMMANDER_HOST, FILESYSTEM_WORKERS, COMMANDER_WORKERS
+from config import BULK_TOOLS, TOOL_CONCURRENCY, QUEUE_LIMITS
 
 # ==================== 설정 ====================
 API_KEY = "yoojin-secret-2026-xyz789"
 PORT = 8765
 
+# ==================== 워커 풀 / 스케줄러 ====================
+filesystem_scheduler = ToolScheduler("filesystem", FILESYSTEM_WORKERS, BULK_TOOLS, TOOL_CONCURRENCY, QUEUE_LIMITS)
+commander_scheduler = ToolScheduler("commander", COMMANDER_WORKERS, BULK_TOOLS, TOOL_CONCURRENCY, QUEUE_LIMITS)
+schedulers = [filesystem_scheduler, commander_scheduler]
+
+filesystem_pool = WorkerPool("filesystem", FILESYSTEM_WORKERS, filesystem_scheduler)
+commander_pool = WorkerPool("commander", COMMANDER_WORKERS, commander_scheduler)
+
 # ==================== MCP 서버 생성 ====================
+filesystem_mcp = FastMCP(name="PC-Remote-Filesystem")
+commander_mcp = FastMCP(name="PC-Remote-Commander")
 mcp = FastMCP(name="PC-Remote")
 
 # ==================== 커넥터 도구 등록 ====================
-filesystem.register_tools(mcp)
-commander.register_tools(mcp)
+filesystem.register_tools(filesystem_pool.bind(filesystem_mcp))
+commander.register_tools(commander_pool.bind(commander_mcp))
+
+filesystem.register_tools(filesystem_pool.bind(mcp))
+commander.register_tools(commander_pool.bind(mcp))
+
+for server in (filesystem_mcp, commander_mcp, mcp):
+    scheduler.register_tools(server, schedulers)
+
+# ==================== Host 라우팅 ====================
+filesystem_app = filesystem_mcp.http_app(path="/mcp")
+commander_app = commander_mcp.http_app(path="/mcp")
+all_app = mcp.http_app(path="/mcp")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """하위 MCP 앱들의 세션 매니저를 같이 시작/종료"""
+    async with contextlib.AsyncExitStack() as stack:
+        for sub_app in (filesystem_app, commander_app, all_app):
+            await stack.enter_async_context(sub_app.router.lifespan_context(sub_app))
+        try:
+            yield
+        finally:
+            filesystem_pool.shutdown()
+            commander_pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Host(FILESYSTEM_HOST, app=filesystem_app),
+        Host(COMMANDER_HOST, app=commander_app),
+        Mount("/", app=all_app),
+    ],
+    lifespan=lifespan,
+)
 
 # ==================== 서버 실행 ====================
 if __name__ == "__main__":
@@ -39,12 +94,13 @@ if __name__ == "__main__":
     print(f"Local: http://127.0.0.1:{PORT}/mcp")
     print(f"")
     print(f"External (via Cloudflare Tunnel):")
-    print(f"  https://pc.jmshinhwa.org/mcp?key={API_KEY}")
-    print(f"  https://pc-cmd.jmshinhwa.org/mcp?key={API_KEY}")
+    print(f"  https://{FILESYSTEM_HOST}/mcp?key={API_KEY}")
+    print(f"  https://{COMMANDER_HOST}/mcp?key={API_KEY}")
     print(f"")
-    print(f"Tools: {len(filesystem.TOOLS) + len(commander.TOOLS)} total")
-    print(f"  - Filesystem: {len(filesystem.TOOLS)}")
-    print(f"  - Commander: {len(commander.TOOLS)}")
+    print(f"Tools: {len(filesystem.TOOLS) + len(commander.TOOLS) + len(scheduler.TOOLS)} total")
+    print(f"  - Filesystem: {len(filesystem.TOOLS)} (workers: {FILESYSTEM_WORKERS})")
+    print(f"  - Commander: {len(commander.TOOLS)} (workers: {COMMANDER_WORKERS})")
+    print(f"  - Scheduler: {len(scheduler.TOOLS)}")
     print("="*60 + "\n")
-    
-    mcp.run(transport="streamable-http", host="127.0.0.1", port=PORT)
+
+    uvicorn.run(app, host="127.0.0.1", port=PORT)